@@ -3,7 +3,6 @@ from datetime import datetime
 
 from api.flight_search import get_flight_info
 from api.web_search import duckduckgo_search
-from memory.memory_manager import get_past_context, save_to_memory
 from memory.training_manager import TrainingManager
 from memory.chat_manager import (
     create_new_chat_session,
@@ -13,7 +12,7 @@ from memory.chat_manager import (
     delete_chat_session
 )
 from db.setup import init_db
-from llm.setup_llm import get_llm_response
+from llm.setup_llm import get_llm_response, build_messages, ERROR_RESPONSE
 
 # Initialize database and training manager
 init_db()
@@ -73,22 +72,18 @@ if st.session_state.current_session_id:
         with st.chat_message("user"):
             st.write(prompt)
 
-        # Get AI response
-        past_context = get_past_context()
-        context_prompt = "\n".join([f"User: {u}\nAI: {r}" for u, r in past_context])
-        full_prompt = context_prompt + f"\nUser: {prompt}\nAI:"
+        # Get AI response; the transcript loaded above is append-only, which keeps the
+        # prompt prefix identical across turns for provider-side prompt caching
+        llm_messages = build_messages(messages, prompt)
 
         try:
             llm_response = get_llm_response(
-                full_prompt,
+                llm_messages,
                 site_url="https://yourprojectsite.com",
                 site_title="Flight Assistant"
             )
         except Exception as e:
-            llm_response = f"I apologize, but I encountered an error while processing your request. Please try again."
-
-        # Save to memory
-        save_to_memory(prompt, llm_response)
+            llm_response = ERROR_RESPONSE
 
         # Get additional data
         flight_data = get_flight_info(prompt)
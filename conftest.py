@@ -0,0 +1 @@
+# Lets pytest import the top-level packages (db, memory, llm, ...) from the repo root
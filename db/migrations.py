@@ -0,0 +1,122 @@
+from sqlalchemy import (
+    select, text, MetaData, Table, Column, Integer, String, Float, DateTime,
+    ForeignKey, JSON, Boolean
+)
+from datetime import datetime
+from db.models import (
+    ChatSession, ChatMessage, ChatMemory, TrainingData, SchemaMigration
+)
+
+# Schema as it stood before migrations were introduced. Migration 1 creates exactly
+# this, never the current models, so later migrations always start from the same place.
+baseline = MetaData()
+
+Table('chat_sessions', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('created_at', DateTime))
+
+Table('chat_messages', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('session_id', Integer, ForeignKey('chat_sessions.id')),
+      Column('role', String(10)),
+      Column('content', String),
+      Column('timestamp', DateTime))
+
+Table('chat_memory', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('user_input', String),
+      Column('response', String),
+      Column('timestamp', DateTime))
+
+Table('users', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('username', String(50), unique=True, nullable=False),
+      Column('email', String(100), unique=True, nullable=False),
+      Column('created_at', DateTime))
+
+Table('search_history', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('user_id', Integer, ForeignKey('users.id')),
+      Column('search_type', String(20)),
+      Column('origin', String(100)),
+      Column('destination', String(100)),
+      Column('departure_date', DateTime),
+      Column('return_date', DateTime),
+      Column('search_results', JSON),
+      Column('created_at', DateTime))
+
+Table('user_preferences', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('user_id', Integer, ForeignKey('users.id')),
+      Column('preferred_airlines', JSON),
+      Column('preferred_hotel_chains', JSON),
+      Column('preferred_cuisines', JSON),
+      Column('budget_range', JSON),
+      Column('created_at', DateTime),
+      Column('updated_at', DateTime))
+
+Table('training_data', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('user_input', String),
+      Column('response', String),
+      Column('feedback_score', Float),
+      Column('feedback_comment', String),
+      Column('is_helpful', Boolean),
+      Column('created_at', DateTime),
+      Column('used_for_training', Boolean))
+
+Table('model_versions', baseline,
+      Column('id', Integer, primary_key=True),
+      Column('version', String),
+      Column('training_data_count', Integer),
+      Column('performance_metrics', JSON),
+      Column('created_at', DateTime),
+      Column('is_active', Boolean))
+
+def _create_tables(connection):
+    """Create the baseline tables that do not exist yet"""
+    baseline.create_all(connection)
+
+def _add_hot_path_indexes(connection):
+    """Add indexes for the history, context and training-data queries"""
+    for model in (ChatSession, ChatMessage, ChatMemory, TrainingData):
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+def _add_chat_memory_session_id(connection):
+    """Scope chat memory to a chat session"""
+    connection.execute(text('ALTER TABLE chat_memory ADD COLUMN session_id INTEGER'))
+    # Created here rather than declared on the model, so migration 2 never tries to
+    # index a column that older databases do not have yet
+    connection.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_chat_memory_session_id_timestamp '
+        'ON chat_memory (session_id, timestamp)'
+    ))
+
+# Ordered list of (version, name, upgrade). Append new migrations; never edit applied ones.
+MIGRATIONS = [
+    (1, "create_tables", _create_tables),
+    (2, "add_hot_path_indexes", _add_hot_path_indexes),
+    (3, "add_chat_memory_session_id", _add_chat_memory_session_id),
+]
+
+def get_applied_versions(engine):
+    """Get the set of migration versions already applied to the database"""
+    with engine.begin() as connection:
+        SchemaMigration.__table__.create(connection, checkfirst=True)
+        rows = connection.execute(select(SchemaMigration.version)).scalars()
+        return set(rows)
+
+def run_migrations(engine):
+    """Apply pending migrations in order, each in its own transaction"""
+    applied = get_applied_versions(engine)
+    for version, name, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(
+                SchemaMigration.__table__.insert().values(
+                    version=version, name=name, applied_at=datetime.utcnow()
+                )
+            )
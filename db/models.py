@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from utils.env_loader import DATABASE_URL
 
 Base = declarative_base()
 
@@ -12,6 +13,10 @@ class ChatSession(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_chat_sessions_created_at', 'created_at'),
+    )
+
 class ChatMessage(Base):
     __tablename__ = 'chat_messages'
     
@@ -23,14 +28,28 @@ class ChatMessage(Base):
     
     session = relationship("ChatSession", back_populates="messages")
 
+    __table_args__ = (
+        # Serves the per-session history load: WHERE session_id = ? ORDER BY timestamp
+        Index('ix_chat_messages_session_id_timestamp', 'session_id', 'timestamp'),
+    )
+
+# Legacy turn log. The prompt context now comes from the session transcript in
+# chat_messages, so nothing writes here; the table is kept for its migrations.
 class ChatMemory(Base):
     __tablename__ = 'chat_memory'
     
     id = Column(Integer, primary_key=True)
+    session_id = Column(Integer, ForeignKey('chat_sessions.id'))
     user_input = Column(String)
     response = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Serves ORDER BY timestamp DESC LIMIT n for recent context
+        Index('ix_chat_memory_timestamp', 'timestamp'),
+        # ix_chat_memory_session_id_timestamp is created by migration 3
+    )
+
 class User(Base):
     __tablename__ = 'users'
     
@@ -83,6 +102,11 @@ class TrainingData(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     used_for_training = Column(Boolean, default=False)  # Track if this data has been used for training
 
+    __table_args__ = (
+        # Serves WHERE used_for_training = ? AND feedback_score >= ?
+        Index('ix_training_data_used_feedback', 'used_for_training', 'feedback_score'),
+    )
+
 class ModelVersion(Base):
     __tablename__ = 'model_versions'
     
@@ -93,7 +117,23 @@ class ModelVersion(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=False)  # Whether this is the currently active model
 
+class SchemaMigration(Base):
+    __tablename__ = 'schema_migrations'
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String(100))
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+# Single engine shared by every manager; configured through DATABASE_URL
+engine = create_engine(DATABASE_URL)
+_migrated = False
+
 def init_db():
-    engine = create_engine('sqlite:///travel_planner.db')
-    Base.metadata.create_all(engine)
+    """Bring the schema up to date (once per process) and return the shared engine"""
+    global _migrated
+    if not _migrated:
+        from db.migrations import run_migrations
+        run_migrations(engine)
+        _migrated = True
     return engine
+
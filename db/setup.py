@@ -1,10 +1,5 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from .models import Base
+from .models import engine, init_db
 
-engine = create_engine('sqlite:///chat_memory.db')
 Session = sessionmaker(bind=engine)
 session = Session()
-
-def init_db():
-    Base.metadata.create_all(engine)
@@ -2,13 +2,16 @@ from typing import Dict, Any, List
 import json
 from datetime import datetime
 from memory.training_manager import TrainingManager
+from memory.dataset_curator import DatasetCurator
 from transformers import AutoModelForCausalLM, AutoTokenizer, TrainingArguments, Trainer
 import torch
 from datasets import Dataset
 
 class ModelTrainer:
-    def __init__(self, base_model_name: str = "gpt2"):
+    # Per feedback score; with ratings of 4 and 5 this matches the old cap of 1000 examples
+    def __init__(self, base_model_name: str = "gpt2", max_per_score: int = 500):
         self.base_model_name = base_model_name
+        self.max_per_score = max_per_score
         self.training_manager = TrainingManager()
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
@@ -94,8 +97,15 @@ class ModelTrainer:
     
     def run_training_pipeline(self) -> Dict[str, Any]:
         """Run the complete training pipeline"""
-        # Get high-quality training data
-        training_data = self.training_manager.get_training_data()
+        # Stream high-quality training data through near-duplicate removal and sampling
+        curator = DatasetCurator(max_per_score=self.max_per_score)
+        rows = self.training_manager.iter_training_data(min_feedback_score=4.0, unused_only=True)
+        training_data = curator.curate({
+            'id': row['id'],
+            'input': row['user_input'],
+            'response': row['response'],
+            'feedback_score': row['feedback_score']
+        } for row in rows)
         
         if not training_data:
             return {'status': 'no_data', 'message': 'No new training data available'}
@@ -109,11 +119,12 @@ class ModelTrainer:
             prepared_data['validation']
         )
         
-        # Mark data as used
-        data_ids = [d['id'] for d in training_data]
-        self.training_manager.mark_data_as_used(data_ids)
+        # Mark the trained rows and the near-duplicates they stand in for as used;
+        # rows dropped by sampling stay available to later runs
+        self.training_manager.mark_data_as_used(curator.represented_ids(training_data))
         
         return {
             'status': 'success',
-            'results': training_results
+            'results': training_results,
+            'curation': curator.stats
         } 
\ No newline at end of file
@@ -0,0 +1,212 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+from openai import AsyncOpenAI
+
+class ModelStats:
+    """Rolling latency and error window for one model"""
+
+    def __init__(self, window: int = 100):
+        self.latencies = deque(maxlen=window)
+        self.errors = deque(maxlen=window)
+        self.requests = 0
+        self.wins = 0
+        self.hedged = 0
+        self.cancelled = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+
+    def record(self, latency: float, error: bool = False) -> None:
+        self.requests += 1
+        self.errors.append(error)
+        if not error:
+            self.latencies.append(latency)
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """Count a cancelled attempt; its elapsed time is a lower bound on the real latency"""
+        self.requests += 1
+        self.cancelled += 1
+        self.latencies.append(elapsed)
+
+    def record_usage(self, usage) -> None:
+        """Accumulate prompt tokens, split into cached and uncached, from a response's usage"""
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.prompt_tokens += usage.prompt_tokens or 0
+        self.cached_prompt_tokens += (getattr(details, 'cached_tokens', None) or 0) if details else 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def error_rate(self) -> float:
+        return sum(self.errors) / len(self.errors) if self.errors else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'wins': self.wins,
+            'win_rate': self.wins / self.requests if self.requests else 0.0,
+            'hedged': self.hedged,
+            'cancelled': self.cancelled,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'error_rate': self.error_rate(),
+            'prompt_tokens': self.prompt_tokens,
+            'cached_prompt_tokens': self.cached_prompt_tokens,
+            'uncached_prompt_tokens': self.prompt_tokens - self.cached_prompt_tokens,
+            'prompt_cache_hit_rate': (self.cached_prompt_tokens / self.prompt_tokens
+                                      if self.prompt_tokens else 0.0),
+        }
+
+class LLMRouter:
+    """Route chat completions across models, hedging to a fallback when the primary runs slow.
+
+    routes maps a turn type to an ordered list of models; the first healthy model is the
+    primary and the next one is the hedge. A hedge is sent once the primary has been
+    running longer than its rolling p95 (or hedge_after until enough samples exist), and
+    immediately if the primary fails. Whichever answers first wins; the other is cancelled.
+    """
+
+    def __init__(self, routes: Dict[str, List[str]], base_url: str, api_key: str,
+                 hedge_after: float = 10.0, min_samples: int = 20,
+                 max_error_rate: float = 0.5, window: int = 100):
+        self.routes = routes
+        self.base_url = base_url
+        self.api_key = api_key
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.window = window
+        self.stats: Dict[str, ModelStats] = {}
+        self.decisions = deque(maxlen=200)
+        self._lock = threading.Lock()
+        # One long-lived loop and client so pooled connections are reused across turns
+        self._loop = None
+        self._client = None
+
+    def _stats(self, model: str) -> ModelStats:
+        with self._lock:
+            if model not in self.stats:
+                self.stats[model] = ModelStats(self.window)
+            return self.stats[model]
+
+    def _record(self, model: str, latency: float, error: bool = False, usage=None) -> None:
+        stats = self._stats(model)
+        with self._lock:
+            stats.record(latency, error)
+            stats.record_usage(usage)
+
+    def select_models(self, turn_type: str = "chat") -> List[str]:
+        """Order a route's models so that models over the error budget go last"""
+        models = self.routes.get(turn_type) or self.routes["chat"]
+        healthy = [m for m in models if self._stats(m).error_rate() <= self.max_error_rate]
+        return healthy + [m for m in models if m not in healthy]
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait on a model before hedging"""
+        stats = self._stats(model)
+        if len(stats.latencies) < self.min_samples:
+            return self.hedge_after
+        return stats.percentile(0.95)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop and its client on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-router", daemon=True).start()
+                # Retries stay off: the SDK would retry failures before the router sees
+                # them, hiding errors from error_rate and delaying the hedge
+                self._client = AsyncOpenAI(base_url=self.base_url, api_key=self.api_key,
+                                           max_retries=0)
+                self._loop = loop
+            return self._loop
+
+    async def _call(self, model: str, messages, extra_headers):
+        started = time.monotonic()
+        try:
+            response = await self._client.chat.completions.create(
+                extra_headers=extra_headers,
+                model=model,
+                messages=messages
+            )
+        except asyncio.CancelledError:
+            # Kept as a censored sample so a primary that always loses still moves its p95
+            stats = self._stats(model)
+            with self._lock:
+                stats.record_cancelled(time.monotonic() - started)
+            raise
+        except Exception:
+            self._record(model, time.monotonic() - started, error=True)
+            raise
+        self._record(model, time.monotonic() - started, usage=response.usage)
+        return response
+
+    async def _acomplete(self, messages: List[Dict[str, str]], turn_type: str = "chat",
+                         extra_headers: Dict[str, str] = None):
+        """Return the first successful completion for a turn, hedging if needed.
+
+        Runs on the router's background loop, which owns the shared client.
+        """
+        models = self.select_models(turn_type)
+        primary = models[0]
+        fallback = models[1] if len(models) > 1 else None
+        delay = self.hedge_delay(primary)
+        decision = {'turn_type': turn_type, 'primary': primary, 'hedge_delay': delay,
+                    'hedged': False, 'winner': None}
+
+        tasks = {asyncio.create_task(self._call(primary, messages, extra_headers)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        primary_failed = bool(done) and next(iter(done)).exception() is not None
+        if fallback and (not done or primary_failed):
+            decision['hedged'] = True
+            fallback_stats = self._stats(fallback)
+            with self._lock:
+                fallback_stats.hedged += 1
+            tasks[asyncio.create_task(self._call(fallback, messages, extra_headers))] = fallback
+
+        pending = set(tasks)
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        decision['winner'] = winner
+                        winner_stats = self._stats(winner)
+                        with self._lock:
+                            winner_stats.wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            with self._lock:
+                self.decisions.append(decision)
+
+    def complete(self, messages: List[Dict[str, str]], turn_type: str = "chat",
+                 extra_headers: Dict[str, str] = None):
+        """Run a turn on the background loop and wait for its result"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._acomplete(messages, turn_type, extra_headers), loop
+        )
+        return future.result()
+
+    def report(self) -> Dict[str, Any]:
+        """Per-model latency, error and win statistics plus recent routing decisions"""
+        with self._lock:
+            return {
+                'models': {model: stats.summary() for model, stats in self.stats.items()},
+                'decisions': list(self.decisions),
+            }
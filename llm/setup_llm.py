@@ -1,24 +1,72 @@
-from openai import OpenAI
-from utils.env_loader import OPENROUTER_API_KEY
+from llm.router import LLMRouter
+from utils.env_loader import (
+    OPENROUTER_API_KEY, LLM_BASE_URL, LLM_PRIMARY_MODEL, LLM_FALLBACK_MODEL
+)
+
+# Ordered models per turn type: the first healthy one is primary, the next is the hedge
+ROUTES = {
+    "chat": [LLM_PRIMARY_MODEL, LLM_FALLBACK_MODEL],
+}
+
+# Kept byte-identical across turns so providers can reuse the cached prompt prefix
+SYSTEM_PROMPT = "You are a helpful flight assistant."
+
+# Stored as the assistant reply of a failed turn; build_messages leaves such turns out
+ERROR_RESPONSE = "I apologize, but I encountered an error while processing your request. Please try again."
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
+router = LLMRouter(
+    routes=ROUTES,
+    base_url=LLM_BASE_URL,
     api_key=OPENROUTER_API_KEY,
 )
 
-def get_llm_response(prompt, site_url=None, site_title=None):
+def build_messages(history, prompt, max_history=40, block=20):
+    """Build a chat messages list whose prefix stays stable as the conversation grows.
+
+    history is the session transcript as [{"role", "content"}, ...], oldest first.
+    When it exceeds max_history messages, the oldest messages are dropped in whole
+    blocks, so the prefix only changes once every `block` messages instead of every turn.
+    Failed turns, whose reply is ERROR_RESPONSE, are left out along with their question.
+    """
+    kept = []
+    for m in history:
+        if m["role"] == "assistant" and m["content"] == ERROR_RESPONSE:
+            if kept and kept[-1]["role"] == "user":
+                kept.pop()
+            continue
+        kept.append(m)
+    history = kept
+    if len(history) > max_history:
+        drop = -(-(len(history) - max_history) // block) * block
+        history = history[drop:]
+    # Never open the history on a reply whose question was trimmed away
+    start = 0
+    while start < len(history) and history[start]["role"] != "user":
+        start += 1
+    history = history[start:]
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    messages.extend({"role": m["role"], "content": m["content"]} for m in history)
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def get_llm_response(prompt, site_url=None, site_title=None, turn_type="chat"):
+    """Get a completion for a prompt string or a full chat messages list"""
     headers = {}
     if site_url:
         headers["HTTP-Referer"] = site_url
     if site_title:
         headers["X-Title"] = site_title
 
-    response = client.chat.completions.create(
-        extra_headers=headers,
-        model="shisa-ai/shisa-v2-llama3.3-70b:free",
-        messages=[
-            {"role": "system", "content": "You are a helpful flight assistant."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    if isinstance(prompt, str):
+        messages = build_messages([], prompt)
+    else:
+        messages = list(prompt)
+        if not messages or messages[0]["role"] != "system":
+            messages.insert(0, {"role": "system", "content": SYSTEM_PROMPT})
+
+    response = router.complete(messages, turn_type=turn_type, extra_headers=headers)
     return response.choices[0].message.content
+
+def get_router_report():
+    """Per-model latency, error, win and prompt-cache statistics for the LLM router"""
+    return router.report()
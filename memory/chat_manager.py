@@ -67,4 +67,25 @@ def delete_chat_session(session_id):
         session.query(ChatSession).filter(ChatSession.id == session_id).delete()
         session.commit()
     finally:
-        session.close() 
\ No newline at end of file
+        session.close()
+
+def iter_all_messages(since_id=0, batch_size=1000):
+    """Stream every chat message with an id above since_id, oldest first"""
+    engine = init_db()
+    session = Session(engine)
+    try:
+        # Column rows with yield_per keep memory constant instead of loading ORM objects
+        rows = session.query(
+                ChatMessage.id,
+                ChatMessage.session_id,
+                ChatMessage.role,
+                ChatMessage.content,
+                ChatMessage.timestamp
+            )\
+            .filter(ChatMessage.id > since_id)\
+            .order_by(ChatMessage.id)\
+            .yield_per(batch_size)
+        for row in rows:
+            yield dict(row._mapping)
+    finally:
+        session.close()
@@ -0,0 +1,128 @@
+import random
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import numpy as np
+
+# Mersenne prime for the MinHash permutations; shingle hashes are reduced below it
+_PRIME = (1 << 31) - 1
+_TOKEN_RE = re.compile(r"\w+")
+
+class DatasetCurator:
+    """Streaming near-duplicate removal and stratified sampling for training examples.
+
+    Records are compared on the MinHash signature of their word shingles. LSH banding
+    finds candidate duplicates among the records kept so far, and a candidate counts as
+    a duplicate when the estimated Jaccard similarity reaches threshold. Only signatures
+    of kept records are held in memory, so the input can be an unbounded stream.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, fields=('input', 'response'),
+                 max_per_score: Optional[int] = None, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.fields = fields
+        self.max_per_score = max_per_score
+        self.rng = random.Random(seed)
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self._buckets = defaultdict(list)
+        # Kept record id -> ids of the records dropped as its near-duplicates
+        self.duplicate_ids: Dict[Any, List[int]] = defaultdict(list)
+        self.stats = {'seen': 0, 'duplicates': 0, 'kept': 0, 'sampled': 0, 'reduction_ratio': 0.0}
+
+    def _shingles(self, record: Dict[str, Any]) -> np.ndarray:
+        text = " ".join(str(record.get(f) or "") for f in self.fields).lower()
+        tokens = _TOKEN_RE.findall(text)
+        n = self.shingle_size
+        grams = {" ".join(tokens[i:i + n]) for i in range(max(1, len(tokens) - n + 1))}
+        return np.fromiter((zlib.crc32(g.encode()) % _PRIME for g in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    def signature(self, record: Dict[str, Any]) -> np.ndarray:
+        """MinHash signature of a record's word shingles"""
+        hashes = self._shingles(record)
+        # (a * x + b) mod p stays below 2**63 because a, x < 2**31
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def find_duplicate(self, record: Dict[str, Any]):
+        """Return the (id, signature) entry of a kept record this one nearly duplicates.
+
+        Returns None, and remembers the record as kept, if it is new.
+        """
+        sig = self.signature(record)
+        keys = [(band, sig[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes())
+                for band in range(self.bands)]
+        checked = set()
+        for key in keys:
+            for entry in self._buckets.get(key, ()):
+                if id(entry) in checked:
+                    continue
+                checked.add(id(entry))
+                if np.mean(entry[1] == sig) >= self.threshold:
+                    return entry
+        entry = (record.get('id'), sig)
+        for key in keys:
+            self._buckets[key].append(entry)
+        return None
+
+    def deduplicate(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the records that are not near-duplicates of an earlier record"""
+        for record in records:
+            self.stats['seen'] += 1
+            match = self.find_duplicate(record)
+            if match is not None:
+                self.stats['duplicates'] += 1
+                if match[0] is not None and 'id' in record:
+                    self.duplicate_ids[match[0]].append(record['id'])
+                continue
+            self.stats['kept'] += 1
+            yield record
+
+    def curate(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deduplicate a stream of records, then sample up to max_per_score per feedback score"""
+        if self.max_per_score is None:
+            sampled = list(self.deduplicate(records))
+        else:
+            # One reservoir per feedback score keeps memory bounded by max_per_score * strata
+            reservoirs = defaultdict(list)
+            counts = defaultdict(int)
+            for record in self.deduplicate(records):
+                score = record.get('feedback_score')
+                counts[score] += 1
+                reservoir = reservoirs[score]
+                if len(reservoir) < self.max_per_score:
+                    reservoir.append(record)
+                else:
+                    j = self.rng.randrange(counts[score])
+                    if j < self.max_per_score:
+                        reservoir[j] = record
+            sampled = [r for score in sorted(reservoirs, key=str) for r in reservoirs[score]]
+
+        self.stats['sampled'] = len(sampled)
+        if self.stats['seen']:
+            self.stats['reduction_ratio'] = 1 - len(sampled) / self.stats['seen']
+        return sampled
+
+    def represented_ids(self, sampled: Iterable[Dict[str, Any]]) -> List[int]:
+        """Ids of the sampled records plus the duplicates each of them stands in for.
+
+        Records dropped by sampling, and duplicates of those, are not included, so they
+        stay available to later runs.
+        """
+        ids = []
+        for record in sampled:
+            if 'id' not in record:
+                continue
+            ids.append(record['id'])
+            ids.extend(self.duplicate_ids.get(record['id'], ()))
+        return ids
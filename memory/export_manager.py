@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import time
+from typing import Dict, Any, Iterable, Optional
+from sqlalchemy import Integer, Float, Boolean, DateTime, String
+from db.models import ChatMessage, TrainingData
+from memory.chat_manager import iter_all_messages
+from memory.training_manager import TrainingManager
+from utils.file_utils import json_line, publish_file
+
+WATERMARK_FILE = "watermarks.json"
+
+def load_watermark(out_dir: str, name: str) -> int:
+    """Get the last exported id of a dataset, or 0 if it was never exported"""
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f).get(name, 0)
+
+def save_watermark(out_dir: str, name: str, last_id: int) -> None:
+    """Record the last exported id of a dataset"""
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    watermarks = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            watermarks = json.load(f)
+    watermarks[name] = last_id
+    with open(path + ".tmp", "w") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def arrow_schema(table):
+    """Arrow schema for the columns of a SQLAlchemy table, every field nullable"""
+    import pyarrow as pa
+    type_map = [
+        (Boolean, pa.bool_()),
+        (DateTime, pa.timestamp('us')),
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+        (String, pa.string()),
+    ]
+    fields = []
+    for column in table.columns:
+        arrow_type = next((t for sa_type, t in type_map if isinstance(column.type, sa_type)),
+                          pa.string())
+        fields.append(pa.field(column.name, arrow_type, nullable=True))
+    return pa.schema(fields)
+
+class _JsonlShard:
+    def __init__(self, path: str, table=None):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json_line(row))
+
+    def close(self):
+        self.file.close()
+
+class _ArrowShard:
+    def __init__(self, path: str, table=None):
+        import pyarrow as pa
+        self.pa = pa
+        # A fixed schema keeps batches compatible when a nullable column is all-None
+        # in one batch and populated in the next
+        self.schema = arrow_schema(table)
+        self.sink = pa.OSFile(path, "wb")
+        self.writer = pa.ipc.new_file(self.sink, self.schema)
+
+    def write(self, rows):
+        self.writer.write_batch(self.pa.RecordBatch.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+
+SHARD_WRITERS = {
+    "jsonl": (_JsonlShard, "jsonl"),
+    "arrow": (_ArrowShard, "arrow"),
+}
+
+def export_rows(rows: Iterable[Dict[str, Any]], out_dir: str, name: str,
+                shard_size: int = 100000, fmt: str = "jsonl",
+                batch_size: int = 1000, table=None) -> Dict[str, Any]:
+    """Write a stream of rows to shard files, holding at most one batch in memory.
+
+    table is the SQLAlchemy table the rows come from; the Arrow format needs it for
+    the schema.
+    """
+    if fmt == "arrow" and table is None:
+        raise ValueError("Arrow export needs the source table for its schema")
+    writer_cls, extension = SHARD_WRITERS[fmt]
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.monotonic()
+    shards, total, last_id = [], 0, None
+    shard, shard_rows, batch = None, 0, []
+
+    def flush():
+        nonlocal shard, shard_rows, batch
+        if not batch:
+            return
+        if shard is None:
+            # Shards are named by their first id, so incremental runs never collide;
+            # re-exporting below the watermark does, and fails rather than overwrite
+            path = os.path.join(out_dir, f"{name}-{batch[0]['id']:012d}.{extension}")
+            if os.path.exists(path):
+                raise FileExistsError(f"Export shard already exists: {path}")
+            shard = writer_cls(path + ".tmp", table)
+            shards.append(path)
+        shard.write(batch)
+        shard_rows += len(batch)
+        batch = []
+        if shard_rows >= shard_size:
+            close_shard()
+
+    def close_shard():
+        nonlocal shard, shard_rows
+        if shard is not None:
+            shard.close()
+            publish_file(shards[-1] + ".tmp", shards[-1])
+        shard, shard_rows = None, 0
+
+    for row in rows:
+        batch.append(row)
+        total += 1
+        last_id = row["id"]
+        if len(batch) >= min(batch_size, shard_size - shard_rows):
+            flush()
+    flush()
+    close_shard()
+
+    elapsed = time.monotonic() - started
+    return {
+        "name": name,
+        "rows": total,
+        "shards": shards,
+        "last_id": last_id,
+        "seconds": elapsed,
+        "rows_per_second": total / elapsed if elapsed > 0 else 0.0,
+    }
+
+def export_chat_history(out_dir: str, since_id: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+    """Export chat messages added since the last run (or since_id)"""
+    return _export_incremental(out_dir, "chat_messages", iter_all_messages, since_id,
+                               table=ChatMessage.__table__, **kwargs)
+
+def export_feedback(out_dir: str, since_id: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+    """Export training feedback added since the last run (or since_id)"""
+    return _export_incremental(out_dir, "training_data", TrainingManager().iter_training_data,
+                               since_id, table=TrainingData.__table__, **kwargs)
+
+def _export_incremental(out_dir, name, iter_rows, since_id, batch_size=1000, **kwargs):
+    if since_id is None:
+        since_id = load_watermark(out_dir, name)
+    rows = iter_rows(since_id=since_id, batch_size=batch_size)
+    stats = export_rows(rows, out_dir, name, batch_size=batch_size, **kwargs)
+    if stats["last_id"] is not None:
+        save_watermark(out_dir, name, stats["last_id"])
+    stats["since_id"] = since_id
+    return stats
+
+EXPORTS = {
+    "chat": export_chat_history,
+    "feedback": export_feedback,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream chat history and feedback to sharded files")
+    parser.add_argument("dataset", choices=sorted(EXPORTS) + ["all"])
+    parser.add_argument("--out", default="exports", help="Output directory")
+    parser.add_argument("--since-id", type=int, default=None,
+                        help="Export rows after this id instead of the saved watermark")
+    parser.add_argument("--format", dest="fmt", choices=sorted(SHARD_WRITERS), default="jsonl")
+    parser.add_argument("--shard-size", type=int, default=100000, help="Rows per shard file")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per round trip")
+    args = parser.parse_args(argv)
+
+    datasets = sorted(EXPORTS) if args.dataset == "all" else [args.dataset]
+    for dataset in datasets:
+        stats = EXPORTS[dataset](
+            args.out,
+            since_id=args.since_id,
+            fmt=args.fmt,
+            shard_size=args.shard_size,
+            batch_size=args.batch_size
+        )
+        print(f"{stats['name']}: {stats['rows']} rows in {len(stats['shards'])} shard(s), "
+              f"{stats['rows_per_second']:.0f} rows/s, watermark {stats['last_id'] or stats['since_id']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, Optional
+from sqlalchemy import select, delete, text, exists
+from db.models import ChatSession, ChatMessage, TrainingData, init_db
+from utils.env_loader import ARCHIVE_DIR
+from utils.file_utils import json_line, publish_file
+
+# Rows older than this many days are archived and removed; None keeps a table forever
+DEFAULT_POLICIES = {
+    'chat_messages': 180,
+    'chat_sessions': 180,
+    'training_data': 365,
+}
+
+# Table name -> (model, column the retention age is measured on, extra condition).
+# Policies run in this order, so sessions are checked after their messages are archived.
+RETAINED_TABLES = {
+    'chat_messages': (ChatMessage, 'timestamp', None),
+    # Only sessions with no messages left, so the sidebar never lists emptied chats
+    'chat_sessions': (ChatSession, 'created_at',
+                      ~exists().where(ChatMessage.session_id == ChatSession.id)),
+    # Feedback that has not been trained on yet is never archived
+    'training_data': (TrainingData, 'created_at', TrainingData.used_for_training == True),
+}
+
+class RetentionManager:
+    def __init__(self, policies: Dict[str, Optional[int]] = None,
+                 archive_dir: str = ARCHIVE_DIR, batch_size: int = 1000):
+        unknown = set(policies or {}) - set(RETAINED_TABLES)
+        if unknown:
+            raise ValueError(f"No retention support for tables: {', '.join(sorted(unknown))}")
+        self.engine = init_db()
+        self.policies = dict(DEFAULT_POLICIES, **(policies or {}))
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+
+    def _write_segment(self, table_name: str, run_stamp: str, rows) -> str:
+        """Write one batch of rows to a gzip-compressed JSONL segment file"""
+        table_dir = os.path.join(self.archive_dir, table_name)
+        os.makedirs(table_dir, exist_ok=True)
+        # run_stamp carries a per-run random suffix: SQLite reuses ids once a table has
+        # been emptied, so the id range alone does not make names unique across runs
+        name = f"{table_name}-{run_stamp}-{rows[0]['id']:012d}-{rows[-1]['id']:012d}.jsonl.gz"
+        path = os.path.join(table_dir, name)
+        if os.path.exists(path):
+            raise FileExistsError(f"Archive segment already exists: {path}")
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json_line(row))
+        # Rows are only deleted once their segment is fully on disk
+        publish_file(tmp_path, path)
+        return path
+
+    def archive_table(self, table_name: str, older_than_days: int) -> Dict[str, Any]:
+        """Move rows older than the cutoff into archive segments, one short transaction per batch"""
+        model, age_column, condition = RETAINED_TABLES[table_name]
+        table = model.__table__
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        run_stamp = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        archived, segments, last_id = 0, [], 0
+
+        while True:
+            with self.engine.begin() as connection:
+                query = select(table)\
+                    .where(table.c[age_column] < cutoff)\
+                    .where(table.c.id > last_id)
+                if condition is not None:
+                    query = query.where(condition)
+                rows = connection.execute(
+                    query.order_by(table.c.id).limit(self.batch_size)
+                ).mappings().all()
+                if not rows:
+                    break
+                ids = [row['id'] for row in rows]
+                segments.append(self._write_segment(table_name, run_stamp, rows))
+                connection.execute(delete(table).where(table.c.id.in_(ids)))
+            archived += len(rows)
+            last_id = ids[-1]
+
+        return {'archived': archived, 'segments': segments, 'cutoff': cutoff}
+
+    def vacuum(self, pages: int = 0) -> None:
+        """Return freed pages to the filesystem without rewriting the whole database.
+
+        Only has an effect once enable_incremental_vacuum has been run on the database.
+        """
+        if self.engine.dialect.name != 'sqlite':
+            return
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+
+    def enable_incremental_vacuum(self) -> bool:
+        """Switch a SQLite database to auto_vacuum=INCREMENTAL.
+
+        The switch needs one full VACUUM, which rewrites the file under an exclusive
+        lock, so this is a one-off maintenance step and never part of run_retention.
+        Returns True if the database was converted.
+        """
+        if self.engine.dialect.name != 'sqlite':
+            return False
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            # 2 = INCREMENTAL
+            if connection.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+                return False
+            connection.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            connection.execute(text("VACUUM"))
+        return True
+
+    def run_retention(self) -> Dict[str, Dict[str, Any]]:
+        """Apply every configured policy, then compact the database"""
+        results = {}
+        for table_name in RETAINED_TABLES:
+            days = self.policies.get(table_name)
+            if days is None:
+                continue
+            results[table_name] = self.archive_table(table_name, days)
+        if any(r['archived'] for r in results.values()):
+            self.vacuum()
+        return results
+
+    def read_archive(self, table_name: str, since: datetime = None, until: datetime = None,
+                     **filters) -> Iterator[Dict[str, Any]]:
+        """Stream archived rows of a table, optionally filtered by age and exact column values"""
+        table_dir = os.path.join(self.archive_dir, table_name)
+        if not os.path.isdir(table_dir):
+            return
+        _, age_column, _ = RETAINED_TABLES[table_name]
+        for name in sorted(os.listdir(table_dir)):
+            if not name.endswith('.jsonl.gz'):
+                continue
+            with gzip.open(os.path.join(table_dir, name), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if any(row.get(k) != v for k, v in filters.items()):
+                        continue
+                    if since or until:
+                        ts = row.get(age_column)
+                        ts = datetime.fromisoformat(ts) if ts else None
+                        if ts is None or (since and ts < since) or (until and ts >= until):
+                            continue
+                    yield row
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old rows and compact the database")
+    parser.add_argument("command", choices=["run", "enable-incremental-vacuum"])
+    args = parser.parse_args(argv)
+
+    manager = RetentionManager()
+    if args.command == "enable-incremental-vacuum":
+        converted = manager.enable_incremental_vacuum()
+        print("Database switched to incremental auto_vacuum" if converted
+              else "Database already uses incremental auto_vacuum (or is not SQLite)")
+        return
+    for table_name, result in manager.run_retention().items():
+        print(f"{table_name}: {result['archived']} rows archived in "
+              f"{len(result['segments'])} segment(s)")
+
+if __name__ == "__main__":
+    main()
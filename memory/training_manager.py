@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 from db.models import TrainingData, ModelVersion, init_db
 from datetime import datetime
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import numpy as np
 from sklearn.model_selection import train_test_split
 
@@ -38,6 +38,7 @@ class TrainingManager:
                 .limit(limit)\
                 .all()
             return [{
+                'id': d.id,
                 'input': d.user_input,
                 'response': d.response,
                 'feedback_score': d.feedback_score
@@ -45,6 +46,33 @@ class TrainingManager:
         finally:
             session.close()
             
+    def iter_training_data(self, since_id: int = 0, batch_size: int = 1000,
+                          min_feedback_score: float = None,
+                          unused_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream feedback rows with an id above since_id, oldest first"""
+        session = Session(self.engine)
+        try:
+            query = session.query(
+                    TrainingData.id,
+                    TrainingData.user_input,
+                    TrainingData.response,
+                    TrainingData.feedback_score,
+                    TrainingData.feedback_comment,
+                    TrainingData.is_helpful,
+                    TrainingData.created_at,
+                    TrainingData.used_for_training
+                )\
+                .filter(TrainingData.id > since_id)
+            if min_feedback_score is not None:
+                query = query.filter(TrainingData.feedback_score >= min_feedback_score)
+            if unused_only:
+                query = query.filter(TrainingData.used_for_training == False)
+            rows = query.order_by(TrainingData.id).yield_per(batch_size)
+            for row in rows:
+                yield dict(row._mapping)
+        finally:
+            session.close()
+            
     def prepare_training_data(self, data: List[Dict[str, Any]], 
                             test_size: float = 0.2) -> Dict[str, Any]:
         """Prepare data for training by splitting into train/test sets"""
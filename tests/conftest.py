@@ -0,0 +1,12 @@
+import pytest
+from sqlalchemy import create_engine
+import db.models
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Point the shared engine at a fresh, migrated SQLite file for one test"""
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(db.models, "engine", test_engine)
+    monkeypatch.setattr(db.models, "_migrated", False)
+    yield db.models.init_db()
+    test_engine.dispose()
@@ -0,0 +1,62 @@
+import random
+from collections import Counter
+from memory.dataset_curator import DatasetCurator
+
+BASE = ("Which airlines fly direct from London Heathrow to New York JFK on weekday mornings "
+        "and how much does a return economy ticket usually cost in the summer season")
+
+def record(id, text, score=5.0):
+    return {'id': id, 'input': text, 'response': "Several carriers operate that route daily.",
+            'feedback_score': score}
+
+WORDS = ("flight hotel visa baggage seat lounge transfer refund upgrade delay gate meal "
+         "insurance passport train taxi ferry cruise rental parking wifi pet infant").split()
+
+def distinct_records(start, count, score):
+    # Shuffled word samples share few shingles, so no two rows are near-duplicates
+    return [record(i, " ".join(random.Random(i).sample(WORDS, 12)), score)
+            for i in range(start, start + count)]
+
+def test_near_duplicates_dropped_and_distinct_rows_kept():
+    curator = DatasetCurator()
+    rows = [
+        record(1, BASE),
+        record(2, BASE + " please"),        # near-duplicate of 1
+        record(3, BASE.upper()),            # same shingles after lowercasing
+        record(4, "Can I bring a bicycle on a domestic flight in Japan"),
+        record(5, "Can I bring a surfboard on a domestic flight in Brazil"),
+    ]
+
+    kept = curator.curate(rows)
+
+    assert [r['id'] for r in kept] == [1, 4, 5]
+    assert sorted(curator.duplicate_ids[1]) == [2, 3]
+    assert curator.stats['seen'] == 5
+    assert curator.stats['duplicates'] == 2
+    assert curator.stats['reduction_ratio'] == 1 - 3 / 5
+
+def test_reservoir_respects_max_per_score():
+    curator = DatasetCurator(max_per_score=10)
+    rows = distinct_records(0, 50, 5.0) + distinct_records(50, 30, 4.0) + distinct_records(80, 4, 4.5)
+
+    sampled = curator.curate(rows)
+
+    assert curator.stats['kept'] == 84
+    per_score = Counter(r['feedback_score'] for r in sampled)
+    assert per_score == {5.0: 10, 4.0: 10, 4.5: 4}
+    assert len({r['id'] for r in sampled}) == len(sampled)
+
+def test_represented_ids_leave_unsampled_rows_unmarked():
+    curator = DatasetCurator(max_per_score=5)
+    rows = distinct_records(0, 20, 5.0)
+    # A duplicate of every row, so each kept row stands in for one dropped row
+    rows += [record(r['id'] + 100, r['input'].upper() + "?") for r in rows]
+
+    sampled = curator.curate(rows)
+    marked = set(curator.represented_ids(sampled))
+
+    sampled_ids = {r['id'] for r in sampled}
+    assert len(sampled_ids) == 5
+    assert marked == sampled_ids | {i + 100 for i in sampled_ids}
+    unsampled = set(range(20)) - sampled_ids
+    assert not marked & (unsampled | {i + 100 for i in unsampled})
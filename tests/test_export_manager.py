@@ -0,0 +1,51 @@
+import os
+import pyarrow as pa
+import pytest
+from sqlalchemy.orm import Session
+from db.models import TrainingData
+from memory.export_manager import export_feedback, load_watermark
+
+def add_feedback(engine, count, comment=None, is_helpful=None):
+    with Session(engine) as session:
+        for i in range(count):
+            session.add(TrainingData(user_input=f"q{i}", response=f"a{i}", feedback_score=4.0,
+                                     feedback_comment=comment, is_helpful=is_helpful))
+        session.commit()
+
+def read_arrow(paths):
+    tables = [pa.ipc.open_file(pa.OSFile(path, "rb")).read_all() for path in paths]
+    return pa.concat_tables(tables)
+
+def test_arrow_export_with_all_none_batch_then_incremental(engine, tmp_path):
+    out_dir = str(tmp_path / "exports")
+    # The first batch has only None comments and is_helpful values, the second does not
+    add_feedback(engine, 5)
+    add_feedback(engine, 3, comment="great", is_helpful=True)
+
+    first = export_feedback(out_dir, fmt="arrow", batch_size=5)
+
+    assert first["rows"] == 8
+    assert load_watermark(out_dir, "training_data") == first["last_id"]
+    table = read_arrow(first["shards"])
+    assert table.schema.field("is_helpful").type == pa.bool_()
+    assert table.column("feedback_comment").to_pylist() == [None] * 5 + ["great"] * 3
+
+    add_feedback(engine, 2, comment="fine", is_helpful=False)
+    second = export_feedback(out_dir, fmt="arrow", batch_size=5)
+
+    assert second["since_id"] == first["last_id"]
+    assert second["rows"] == 2
+    assert read_arrow(second["shards"]).schema == table.schema
+    assert len(read_arrow(first["shards"] + second["shards"])) == 10
+
+def test_export_below_watermark_does_not_overwrite_shards(engine, tmp_path):
+    out_dir = str(tmp_path / "exports")
+    add_feedback(engine, 4)
+    first = export_feedback(out_dir)
+    before = open(first["shards"][0]).read()
+
+    with pytest.raises(FileExistsError):
+        export_feedback(out_dir, since_id=0)
+
+    assert open(first["shards"][0]).read() == before
+    assert not [name for name in os.listdir(out_dir) if name.endswith(".tmp")]
@@ -0,0 +1,33 @@
+from sqlalchemy import create_engine, inspect, text
+from db.models import Base
+from db.migrations import MIGRATIONS, baseline, run_migrations
+
+def table_columns(engine):
+    inspector = inspect(engine)
+    return {name: {c['name'] for c in inspector.get_columns(name)}
+            for name in inspector.get_table_names()}
+
+def test_fresh_database_matches_models(engine):
+    columns = table_columns(engine)
+    for table in Base.metadata.sorted_tables:
+        assert columns[table.name] == set(table.columns.keys()), table.name
+
+def test_all_migrations_recorded(engine):
+    with engine.connect() as connection:
+        versions = connection.execute(text("SELECT version FROM schema_migrations")).scalars()
+        assert sorted(versions) == [version for version, _, _ in MIGRATIONS]
+
+def test_baseline_database_upgrades(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    # A database created by create_all before migrations existed
+    baseline.create_all(engine)
+    run_migrations(engine)
+    columns = table_columns(engine)
+    assert 'session_id' in columns['chat_memory']
+    indexes = {i['name'] for i in inspect(engine).get_indexes('chat_memory')}
+    assert {'ix_chat_memory_timestamp', 'ix_chat_memory_session_id_timestamp'} <= indexes
+    engine.dispose()
+
+def test_migrations_are_idempotent(engine):
+    run_migrations(engine)
+    test_all_migrations_recorded(engine)
@@ -0,0 +1,41 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from db.models import ChatSession, ChatMessage, ChatMemory, TrainingData
+
+def query_plan(engine, query):
+    """EXPLAIN QUERY PLAN detail lines for an ORM query"""
+    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        return [row[3] for row in connection.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+def assert_uses_index(plan, index_name):
+    assert any(index_name in detail for detail in plan), plan
+    assert not any(detail.startswith("SCAN") and "INDEX" not in detail for detail in plan), plan
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
+
+def test_recent_chat_memory_uses_timestamp_index(engine):
+    with Session(engine) as session:
+        query = session.query(ChatMemory)\
+            .order_by(ChatMemory.timestamp.desc())\
+            .limit(5)
+        assert_uses_index(query_plan(engine, query), "ix_chat_memory_timestamp")
+
+def test_session_messages_use_session_index(engine):
+    with Session(engine) as session:
+        query = session.query(ChatMessage)\
+            .filter(ChatMessage.session_id == 1)\
+            .order_by(ChatMessage.timestamp)
+        assert_uses_index(query_plan(engine, query), "ix_chat_messages_session_id_timestamp")
+
+def test_chat_sessions_listing_uses_created_at_index(engine):
+    with Session(engine) as session:
+        query = session.query(ChatSession).order_by(ChatSession.created_at.desc())
+        assert_uses_index(query_plan(engine, query), "ix_chat_sessions_created_at")
+
+def test_training_data_uses_feedback_index(engine):
+    with Session(engine) as session:
+        query = session.query(TrainingData)\
+            .filter(TrainingData.feedback_score >= 4.0)\
+            .filter(TrainingData.used_for_training == False)\
+            .limit(1000)
+        assert_uses_index(query_plan(engine, query), "ix_training_data_used_feedback")
@@ -0,0 +1,87 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.orm import Session
+from db.models import ChatSession, ChatMessage, TrainingData
+from memory.retention_manager import RetentionManager
+
+OLD = datetime.utcnow() - timedelta(days=400)
+NEW = datetime.utcnow() - timedelta(days=1)
+
+@pytest.fixture
+def manager(engine, tmp_path):
+    return RetentionManager(archive_dir=str(tmp_path / "archive"), batch_size=3)
+
+def add_session(engine, created_at, message_times):
+    with Session(engine) as session:
+        chat = ChatSession(created_at=created_at)
+        session.add(chat)
+        session.flush()
+        for i, ts in enumerate(message_times):
+            session.add(ChatMessage(session_id=chat.id, role='user', content=f"m{i}", timestamp=ts))
+        session.commit()
+        return chat.id
+
+def count(engine, model):
+    with Session(engine) as session:
+        return session.query(model).count()
+
+def test_old_rows_archived_in_batches_and_new_rows_kept(engine, manager):
+    add_session(engine, OLD, [OLD] * 7 + [NEW] * 2)
+
+    result = manager.archive_table('chat_messages', 180)
+
+    assert result['archived'] == 7
+    assert len(result['segments']) == 3  # batches of 3, 3 and 1
+    assert all(os.path.exists(path) for path in result['segments'])
+    assert count(engine, ChatMessage) == 2
+    assert len(list(manager.read_archive('chat_messages'))) == 7
+
+def test_sessions_archived_only_once_their_messages_are_gone(engine, manager):
+    emptied = add_session(engine, OLD, [OLD, OLD])
+    active = add_session(engine, OLD, [OLD, NEW])
+    recent = add_session(engine, NEW, [])
+
+    results = manager.run_retention()
+
+    assert results['chat_sessions']['archived'] == 1
+    with Session(engine) as session:
+        remaining = {s.id for s in session.query(ChatSession)}
+    assert remaining == {active, recent}
+    assert [row['id'] for row in manager.read_archive('chat_sessions')] == [emptied]
+
+def test_untrained_feedback_is_never_archived(engine, manager):
+    with Session(engine) as session:
+        session.add(TrainingData(user_input='a', response='b', feedback_score=5,
+                                 created_at=OLD, used_for_training=True))
+        session.add(TrainingData(user_input='c', response='d', feedback_score=5,
+                                 created_at=OLD, used_for_training=False))
+        session.commit()
+
+    assert manager.run_retention()['training_data']['archived'] == 1
+    with Session(engine) as session:
+        assert [row.user_input for row in session.query(TrainingData)] == ['c']
+
+def test_read_archive_filters(engine, manager):
+    first = add_session(engine, OLD, [OLD, OLD - timedelta(days=10)])
+    add_session(engine, OLD, [OLD])
+    manager.archive_table('chat_messages', 180)
+
+    assert len(list(manager.read_archive('chat_messages', session_id=first))) == 2
+    assert [row['content'] for row in manager.read_archive(
+        'chat_messages', session_id=first, until=OLD - timedelta(days=5))] == ['m1']
+    assert len(list(manager.read_archive('chat_messages', since=OLD))) == 2
+
+def test_repeated_runs_never_overwrite_segments(engine, manager):
+    add_session(engine, OLD, [OLD] * 3)
+    first = manager.archive_table('chat_messages', 180)['segments']
+    # Once emptied, SQLite hands out the same ids again
+    add_session(engine, OLD, [OLD] * 3)
+    second = manager.archive_table('chat_messages', 180)['segments']
+
+    assert not set(first) & set(second)
+    assert len(list(manager.read_archive('chat_messages'))) == 6
+
+def test_unknown_policy_table_rejected(engine, tmp_path):
+    with pytest.raises(ValueError):
+        RetentionManager(policies={'chat_memory': 30}, archive_dir=str(tmp_path))
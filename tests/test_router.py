@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from llm.router import LLMRouter
+
+# Seconds the "slow" model takes to answer
+SLOW = 2.0
+
+class StubHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint whose behaviour depends on the model"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        model = body["model"]
+        self.server.hits[model] += 1
+        if model == "bad":
+            self.send_json(500, {"error": {"message": "upstream failure"}})
+            return
+        if model == "slow":
+            time.sleep(SLOW)
+        self.send_json(200, {
+            "id": "stub", "object": "chat.completion", "created": 0, "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"answer from {model}"}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 5, "total_tokens": 105,
+                      "prompt_tokens_details": {"cached_tokens": 80}},
+        })
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the router cancelled this request
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    httpd.hits = Counter()
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def make_router(server, models, hedge_after):
+    return LLMRouter({"chat": models}, base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                     api_key="test", hedge_after=hedge_after)
+
+MESSAGES = [{"role": "user", "content": "Find me a flight"}]
+
+def test_slow_primary_is_hedged_and_loser_cancelled(server):
+    router = make_router(server, ["slow", "fast"], hedge_after=0.2)
+
+    started = time.monotonic()
+    response = router.complete(MESSAGES)
+
+    assert time.monotonic() - started < SLOW
+    assert response.choices[0].message.content == "answer from fast"
+    report = router.report()
+    assert report["decisions"] == [{'turn_type': 'chat', 'primary': 'slow', 'hedge_delay': 0.2,
+                                    'hedged': True, 'winner': 'fast'}]
+    slow, fast = report["models"]["slow"], report["models"]["fast"]
+    assert slow["cancelled"] == 1
+    # The cancelled attempt is counted and sampled as a lower bound on its latency
+    assert slow["requests"] == 1
+    assert slow["p50"] >= 0.2
+    assert fast["wins"] == 1 and fast["hedged"] == 1
+
+def test_failed_primary_is_hedged_immediately(server):
+    router = make_router(server, ["bad", "fast"], hedge_after=5.0)
+
+    started = time.monotonic()
+    response = router.complete(MESSAGES)
+
+    assert time.monotonic() - started < 5.0
+    assert response.choices[0].message.content == "answer from fast"
+    # No SDK retries: the failure reaches the router on the first attempt
+    assert server.hits["bad"] == 1
+    decision = router.report()["decisions"][0]
+    assert decision["hedged"] and decision["winner"] == "fast"
+
+def test_report_counts_wins_errors_and_cached_tokens(server):
+    router = make_router(server, ["bad", "fast"], hedge_after=5.0)
+
+    for _ in range(2):
+        router.complete(MESSAGES)
+
+    report = router.report()
+    models = report["models"]
+    # After its first failure "bad" is over the error budget and drops to fallback
+    assert [d["primary"] for d in report["decisions"]] == ["bad", "fast"]
+    assert models["bad"]["requests"] == 1
+    assert models["bad"]["error_rate"] == 1.0
+    assert models["bad"]["wins"] == 0
+    assert models["fast"]["wins"] == 2
+    assert models["fast"]["prompt_tokens"] == 200
+    assert models["fast"]["cached_prompt_tokens"] == 160
+    assert models["fast"]["prompt_cache_hit_rate"] == 0.8
@@ -0,0 +1,49 @@
+import json
+from llm.setup_llm import build_messages, ERROR_RESPONSE, SYSTEM_PROMPT
+
+def transcript(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i}"})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+    return history
+
+def serialized(messages):
+    return [json.dumps(m) for m in messages]
+
+def test_prefix_is_byte_identical_until_a_block_boundary():
+    history = transcript(60)
+    breaks = []
+    previous = None
+    for turn in range(60):
+        messages = build_messages(history[:2 * turn], f"question {turn}", max_history=40, block=20)
+        assert messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+        if previous is not None:
+            # Everything sent last turn except its new prompt is resent unchanged...
+            stable = previous[:-1]
+            if serialized(messages[:len(stable)]) != serialized(stable):
+                breaks.append(turn)
+        previous = messages
+    # ...except when a whole block of the oldest messages is dropped
+    assert breaks == [21, 31, 41, 51]
+
+def test_trimmed_history_never_starts_with_assistant():
+    history = transcript(30)
+    for length in range(len(history) + 1):
+        messages = build_messages(history[:length], "next", max_history=10, block=5)
+        assert len(messages) <= 12
+        if len(messages) > 2:
+            assert messages[1]["role"] == "user"
+        assert messages[-1] == {"role": "user", "content": "next"}
+
+def test_failed_turns_are_left_out():
+    history = transcript(2)
+    history[2:2] = [{"role": "user", "content": "broken question"},
+                    {"role": "assistant", "content": ERROR_RESPONSE}]
+
+    messages = build_messages(history, "next")
+
+    contents = [m["content"] for m in messages]
+    assert ERROR_RESPONSE not in contents
+    assert "broken question" not in contents
+    assert contents[1:] == ["question 0", "answer 0", "question 1", "answer 1", "next"]
@@ -5,3 +5,8 @@ load_dotenv()
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///travel_planner.db")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_PRIMARY_MODEL = os.getenv("LLM_PRIMARY_MODEL", "shisa-ai/shisa-v2-llama3.3-70b:free")
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "meta-llama/llama-3.3-70b-instruct:free")
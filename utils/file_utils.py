@@ -0,0 +1,21 @@
+import json
+import os
+from datetime import datetime
+
+def encode_value(value):
+    """Make a database value JSON serialisable"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def json_line(row) -> str:
+    """Serialise a row mapping as one JSONL line"""
+    return json.dumps({k: encode_value(v) for k, v in row.items()}) + "\n"
+
+def publish_file(tmp_path: str, path: str) -> None:
+    """Move a finished temporary file into place, refusing to overwrite an existing one"""
+    try:
+        # link() fails with FileExistsError instead of replacing the target
+        os.link(tmp_path, path)
+    finally:
+        os.remove(tmp_path)